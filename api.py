@@ -2,20 +2,282 @@
 """
 Module for handling API requests.
 """
-import sys
-import requests
-from rich.progress import Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
-from typing import Optional, Dict, List
-from rich.console import Console
+import httpx
+import orjson
+from aiolimiter import AsyncLimiter
+from functools import lru_cache
+from types import MappingProxyType
+from tenacity import (
+    RetryCallState,
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
+from typing import TYPE_CHECKING, Optional, Dict, Iterable, Mapping, Tuple, Union
 
-def send_request(
+if TYPE_CHECKING:
+    from rich.console import Console
+    from cache import ResponseCache, SemanticCache
+
+_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# While streaming, redraw the answer at line ends or after this many new characters.
+_RENDER_EVERY = 256
+
+# Upper bound for honouring a server-provided Retry-After delay, in seconds.
+_MAX_RETRY_AFTER = 60.0
+
+# Shared HTTP/2 client so TCP/TLS connections are reused across turns. The
+# pool is sized for concurrent batch requests as well as the interactive loop.
+_CLIENT: httpx.AsyncClient = httpx.AsyncClient(
+    http2=True,
+    timeout=httpx.Timeout(60.0, connect=5.0),
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+)
+
+
+class APIError(Exception):
+    """
+    Raised when a request to the API fails after all retries.
+    """
+
+
+# Client-side token bucket shared by every request; see set_rate_limit.
+_LIMITER: Optional[AsyncLimiter] = None
+
+
+def set_rate_limit(requests_per_minute: Optional[int]) -> None:
+    """
+    Throttle outgoing requests to stay under the provider's rate limit.
+
+    Args:
+        requests_per_minute (Optional[int]): Maximum requests per minute, or
+            None (or a value of 0 or less) to disable client-side throttling.
+    """
+    global _LIMITER
+    _LIMITER = AsyncLimiter(requests_per_minute, 60) if requests_per_minute and requests_per_minute > 0 else None
+
+
+async def aclose_client() -> None:
+    """
+    Close the shared HTTP client and release its pooled connections.
+    """
+    await _CLIENT.aclose()
+
+
+@lru_cache(maxsize=1)
+def _build_headers(
+    api_key: str,
+    site_url: Optional[str],
+    site_title: Optional[str]
+) -> Mapping[str, str]:
+    """
+    Build the request headers once per distinct credential/site combination.
+
+    Args:
+        api_key (str): The API key for authentication.
+        site_url (Optional[str]): URL of the site.
+        site_title (Optional[str]): Title of the site.
+
+    Returns:
+        Mapping[str, str]: A read-only mapping of HTTP headers.
+    """
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+    }
+    # Add optional headers if provided.
+    if site_url:
+        headers["HTTP-Referer"] = site_url
+    if site_title:
+        headers["X-Title"] = site_title
+    return MappingProxyType(headers)
+
+
+@lru_cache(maxsize=8)
+def _single_turn_affixes(model: str, stream: bool) -> Tuple[bytes, bytes]:
+    """
+    Pre-serialize the constant parts of a single-question payload.
+
+    Args:
+        model (str): The model to be used.
+        stream (bool): Whether the request asks for SSE streaming.
+
+    Returns:
+        Tuple[bytes, bytes]: The prefix and suffix bytes to splice the encoded question between.
+    """
+    head = {"model": model}
+    if stream:
+        head["stream"] = True
+    # Drop the closing brace so the messages array can follow the constant fields.
+    prefix = orjson.dumps(head)[:-1] + b',"messages":[{"role":"user","content":[{"type":"text","text":'
+    return prefix, b"}]}]}"
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """
+    Decide whether a failed request is worth retrying.
+
+    Network errors, rate limiting (429) and server errors (5xx) are transient;
+    any other 4xx means the request itself is wrong and fails fast.
+
+    Args:
+        exc (BaseException): The exception raised by the request.
+
+    Returns:
+        bool: True if the request should be retried.
+    """
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+_backoff = wait_exponential_jitter(initial=1, max=10)
+
+
+def _wait_retry_after(retry_state: RetryCallState) -> float:
+    """
+    Wait for the server's Retry-After delay if given, else back off exponentially.
+
+    Args:
+        retry_state (RetryCallState): Tenacity's state for the current attempt.
+
+    Returns:
+        float: Seconds to sleep before the next attempt.
+    """
+    exc = retry_state.outcome.exception()
+    if isinstance(exc, httpx.HTTPStatusError):
+        retry_after = exc.response.headers.get("Retry-After", "")
+        try:
+            return min(float(retry_after), _MAX_RETRY_AFTER)
+        except ValueError:
+            pass
+    return _backoff(retry_state)
+
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=_wait_retry_after,
+    retry=retry_if_exception(_is_retryable),
+    reraise=True,
+)
+async def _do_post(headers: Mapping[str, str], body: bytes, stream: bool) -> httpx.Response:
+    """
+    POST a serialized payload to the API, retrying transient failures.
+
+    Args:
+        headers (Mapping[str, str]): HTTP headers for the request.
+        body (bytes): The JSON-encoded payload.
+        stream (bool): Return before the body is read so it can be streamed.
+
+    Returns:
+        httpx.Response: A successful response.
+    """
+    request = _CLIENT.build_request("POST", _URL, headers=headers, content=body)
+    # Every attempt, including retries, takes a token from the bucket.
+    if _LIMITER is not None:
+        async with _LIMITER:
+            response = await _CLIENT.send(request, stream=stream)
+    else:
+        response = await _CLIENT.send(request, stream=stream)
+    if response.is_error:
+        # Read the error body so the connection is released back to the pool.
+        await response.aread()
+        response.raise_for_status()
+    return response
+
+
+def _describe_error(err: Exception) -> str:
+    """
+    Build a readable message for a failed request.
+
+    Args:
+        err (Exception): The exception raised by the request.
+
+    Returns:
+        str: The error message, including the API's own message when available.
+    """
+    if isinstance(err, httpx.HTTPStatusError):
+        try:
+            detail = orjson.loads(err.response.content)["error"]["message"]
+        except (orjson.JSONDecodeError, KeyError, TypeError):
+            detail = err.response.reason_phrase
+        return f"HTTP {err.response.status_code}: {detail}"
+    return str(err) or type(err).__name__
+
+
+async def _stream_completion(
+    headers: Mapping[str, str],
+    body: bytes,
+    console: Optional["Console"]
+) -> Dict:
+    """
+    POST a streaming request and render its SSE tokens as they arrive.
+
+    A single transient live display shows a spinner until the first token
+    and the growing Markdown answer afterwards, redrawn at line ends or every
+    _RENDER_EVERY characters; the caller renders the final answer.
+
+    Args:
+        headers (Mapping[str, str]): HTTP headers for the request.
+        body (bytes): The JSON-encoded payload, with "stream" enabled.
+        console (Optional[Console]): Rich console used for the live display.
+
+    Returns:
+        Dict: A response shaped like a non-streamed completion, or the error payload.
+    """
+    from rich.live import Live
+    from rich.markdown import Markdown
+    from rich.spinner import Spinner
+
+    content = ""
+    rendered = 0
+    thinking = Spinner("point", text="[bold green]🧠 Thinking...[/bold green]")
+    with Live(thinking, console=console, transient=True) as live:
+        response = await _do_post(headers, body, stream=True)
+        try:
+            async for line in response.aiter_lines():
+                # Skip SSE comments (keep-alives) and blank separators.
+                if not line.startswith("data: "):
+                    continue
+                data = line[6:]
+                # Let the iterator run to the end of the body rather than breaking
+                # out, so httpx's nested async generators finish cleanly.
+                if data == "[DONE]":
+                    continue
+                chunk = orjson.loads(data)
+                if "error" in chunk:
+                    return chunk
+                # Frames such as the final usage report carry no choices.
+                choices = chunk.get("choices") or []
+                if not choices:
+                    continue
+                delta = (choices[0].get("delta") or {}).get("content")
+                if delta:
+                    content += delta
+                    # Re-parsing the whole answer on every token is quadratic;
+                    # redraw on the first token, at line ends and every few hundred chars.
+                    if not rendered or "\n" in delta or len(content) - rendered >= _RENDER_EVERY:
+                        live.update(Markdown(content))
+                        rendered = len(content)
+        finally:
+            await response.aclose()
+    return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+
+async def send_request(
     question: str,
     api_key: str,
     model: str,
     site_url: Optional[str] = None,
     site_title: Optional[str] = None,
-    console: Optional[Console] = None,
-    history: Optional[List[dict]] = None  # New parameter for conversation context
+    console: Optional["Console"] = None,
+    history: Optional[Iterable[dict]] = None,  # New parameter for conversation context
+    stream: bool = False,
+    show_progress: bool = True,
+    cache: Optional[Union["ResponseCache", "SemanticCache"]] = None
 ) -> Dict:
     """
     Sends a request to the API and returns the JSON response.
@@ -27,48 +289,72 @@ def send_request(
         site_url (Optional[str]): URL of the site.
         site_title (Optional[str]): Title of the site.
         console (Optional[Console]): Rich console for progress display.
-        history (Optional[List[dict]]): Conversation context as a list of messages.
+        history (Optional[Iterable[dict]]): Conversation context as an iterable of messages.
+        stream (bool): Stream tokens over SSE and render them while they arrive.
+        show_progress (bool): Show the spinner while waiting for a non-streamed response.
+        cache (Optional[Union[ResponseCache, SemanticCache]]): Cache to answer
+            repeated requests from.
 
     Returns:
         Dict: The JSON response from the API.
+
+    Raises:
+        APIError: If the request still fails after retrying transient errors.
     """
-    url = "https://openrouter.ai/api/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
-    # Add optional headers if provided.
-    if site_url:
-        headers["HTTP-Referer"] = site_url
-    if site_title:
-        headers["X-Title"] = site_title
+    # Rich's progress machinery is only needed once a request is actually made.
+    from rich.progress import Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
+
+    headers = _build_headers(api_key, site_url, site_title)
 
     # Build the payload using conversation history if provided.
     if history is None:
         messages = [{"role": "user", "content": [{"type": "text", "text": question}]}]
     else:
-        messages = history
+        # The context is handed over as a live view; materialize it once here.
+        messages = list(history)
 
-    payload = {
-        "model": model,
-        "messages": messages
-    }
+    # Repeated requests are answered from the cache without touching the network.
+    if cache is not None:
+        cached = cache.lookup(model, messages)
+        if cached is not None:
+            return cached
 
-    with Progress(
-        SpinnerColumn(spinner_name="point"),
-        TextColumn("[bold green]🧠 Thinking...[/bold green]"),
-        TimeElapsedColumn(),
-        console=console,
-        transient=True
-    ) as progress:
-        progress.add_task("Waiting for response", total=None)
-        try:
-            response = requests.post(url, headers=headers, json=payload)
-            response.raise_for_status()  # Raise exception for HTTP errors.
-            return response.json()
-        except requests.exceptions.HTTPError as http_err:
-            print(f"HTTP Error: {http_err}")
-            sys.exit(1)
-        except Exception as err:
-            print(f"Error: {err}")
-            sys.exit(1)
+    if history is None:
+        # Single questions (e.g. batch mode) only need the question encoded;
+        # the rest of the body is constant per model.
+        prefix, suffix = _single_turn_affixes(model, stream)
+        body = prefix + orjson.dumps(question) + suffix
+    else:
+        payload = {
+            "model": model,
+            "messages": messages
+        }
+        if stream:
+            payload["stream"] = True
+        # Serialize with orjson; the Content-Type header comes from _build_headers.
+        body = orjson.dumps(payload)
+
+    try:
+        if stream:
+            result = await _stream_completion(headers, body, console)
+        else:
+            with Progress(
+                SpinnerColumn(spinner_name="point"),
+                TextColumn("[bold green]🧠 Thinking...[/bold green]"),
+                TimeElapsedColumn(),
+                console=console,
+                transient=True,
+                disable=not show_progress
+            ) as progress:
+                progress.add_task("Waiting for response", total=None)
+                response = await _do_post(headers, body, stream=False)
+                result = orjson.loads(response.content)
+    except (httpx.HTTPError, orjson.JSONDecodeError) as err:
+        raise APIError(_describe_error(err)) from err
+    except (KeyError, IndexError, TypeError, AttributeError) as err:
+        # A data frame that does not have the expected completion shape.
+        raise APIError(f"Malformed response from the API: {err!r}") from err
+
+    if cache is not None and "error" not in result:
+        cache.store(model, messages, result)
+    return result
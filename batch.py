@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Module for sending a batch of independent questions concurrently.
+"""
+import asyncio
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
+from api import APIError, send_request
+
+if TYPE_CHECKING:
+    from cache import ResponseCache, SemanticCache
+
+
+def load_questions(path: str) -> List[str]:
+    """
+    Read one question per line from a text file, skipping blank lines.
+
+    Args:
+        path (str): Path to the questions file.
+
+    Returns:
+        List[str]: The questions in file order.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+async def send_many(
+    questions: List[str],
+    api_key: str,
+    model: str,
+    site_url: Optional[str] = None,
+    site_title: Optional[str] = None,
+    max_concurrency: int = 8,
+    cache: Optional[Union["ResponseCache", "SemanticCache"]] = None
+) -> List[Dict]:
+    """
+    Send every question as its own request, overlapping the network waits.
+
+    At most max_concurrency requests are in flight at once; the request rate
+    itself is throttled by the API module's shared limiter.
+
+    Args:
+        questions (List[str]): The questions to send.
+        api_key (str): The API key for authentication.
+        model (str): The model to be used.
+        site_url (Optional[str]): URL of the site.
+        site_title (Optional[str]): Title of the site.
+        max_concurrency (int): Maximum number of requests in flight at once.
+        cache (Optional[Union[ResponseCache, SemanticCache]]): Cache to answer
+            repeated questions from.
+
+    Returns:
+        List[Dict]: The API responses, in the same order as the questions.
+            Failed requests are reported as {"error": {"message": ...}}.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _send(question: str) -> Dict:
+        async with semaphore:
+            try:
+                return await send_request(
+                    question,
+                    api_key,
+                    model,
+                    site_url,
+                    site_title,
+                    show_progress=False,
+                    cache=cache
+                )
+            except APIError as err:
+                # Report the failure in place so one bad request does not
+                # discard the answers to the others.
+                return {"error": {"message": str(err)}}
+
+    return await asyncio.gather(*(_send(question) for question in questions))
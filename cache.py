@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Module for caching API responses on disk.
+ResponseCache matches requests exactly by a SHA-256 hash of the canonical
+payload; SemanticCache also matches paraphrased questions by embedding
+similarity.
+"""
+import hashlib
+import os
+from typing import Any, Dict, Iterable, List, Optional
+import diskcache
+import orjson
+
+
+def context_key(model: str, messages: List[Dict[str, Any]]) -> str:
+    """
+    Hash the model and every message before the current question.
+
+    Args:
+        model (str): The model the request is sent to.
+        messages (List[Dict[str, Any]]): The messages sent to the model.
+
+    Returns:
+        str: A hex digest identifying the conversation the question belongs to.
+    """
+    payload = {"model": model, "messages": messages[:-1]}
+    return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+class ResponseCache:
+    """
+    Class to cache successful API responses across sessions.
+    Entries are stored in a diskcache directory, expire after a TTL and are
+    evicted least-recently-used first once the size limit is reached.
+    """
+    def __init__(
+        self,
+        cache_dir: str = ".opengpt_cache",
+        ttl: Optional[float] = 86400,
+        size_limit: int = 256 * 1024 * 1024
+    ) -> None:
+        """
+        Initialize the ResponseCache.
+
+        Args:
+            cache_dir (str): Directory to store the cache in.
+            ttl (Optional[float]): Seconds before an entry expires, or None to keep it.
+            size_limit (int): Maximum size of the cache on disk, in bytes.
+        """
+        self.ttl = ttl
+        self.cache = diskcache.Cache(
+            cache_dir,
+            size_limit=size_limit,
+            eviction_policy="least-recently-used",
+        )
+
+    @staticmethod
+    def make_key(model: str, messages: Iterable[Dict[str, Any]]) -> str:
+        """
+        Build the cache key for a request.
+
+        The payload is serialized with sorted keys so that equal requests
+        always hash the same, regardless of dict insertion order.
+
+        Args:
+            model (str): The model the request is sent to.
+            messages (Iterable[Dict[str, Any]]): The messages sent to the model.
+
+        Returns:
+            str: A hex digest identifying the request.
+        """
+        payload = {"model": model, "messages": list(messages)}
+        return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+
+        Args:
+            key (str): The cache key from make_key.
+
+        Returns:
+            Optional[Dict[str, Any]]: The cached response if found, else None.
+        """
+        return self.cache.get(key)
+
+    def set(self, key: str, response: Dict[str, Any]) -> None:
+        """
+        Store a successful response.
+
+        Args:
+            key (str): The cache key from make_key.
+            response (Dict[str, Any]): The API response to store.
+        """
+        self.cache.set(key, response, expire=self.ttl)
+
+    def lookup(self, model: str, messages: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Find the cached response for an identical request.
+
+        Args:
+            model (str): The model the request is sent to.
+            messages (List[Dict[str, Any]]): The messages sent to the model.
+
+        Returns:
+            Optional[Dict[str, Any]]: The cached response if found, else None.
+        """
+        return self.get(self.make_key(model, messages))
+
+    def store(self, model: str, messages: List[Dict[str, Any]], response: Dict[str, Any]) -> None:
+        """
+        Cache the response to a request.
+
+        Args:
+            model (str): The model the request was sent to.
+            messages (List[Dict[str, Any]]): The messages sent to the model.
+            response (Dict[str, Any]): The API response to store.
+        """
+        self.set(self.make_key(model, messages), response)
+
+
+class SemanticCache:
+    """
+    Class to answer paraphrased questions from earlier responses.
+    Questions are embedded with sentence-transformers and searched in a FAISS
+    inner-product index; both are persisted in a directory. A hit also
+    requires the same model and preceding conversation, so a question is
+    never answered from an unrelated context.
+    """
+    def __init__(
+        self,
+        cache_dir: str = os.path.join(".opengpt_cache", "semantic"),
+        threshold: float = 0.92,
+        model_name: str = "all-MiniLM-L6-v2"
+    ) -> None:
+        """
+        Initialize the SemanticCache.
+
+        Args:
+            cache_dir (str): Directory to store the index and entries in.
+            threshold (float): Minimum cosine similarity for a cache hit.
+            model_name (str): The sentence-transformers embedding model.
+
+        Raises:
+            ImportError: If sentence-transformers or faiss is not installed.
+        """
+        # Heavy optional dependencies, only loaded when the cache is enabled.
+        import faiss
+        from sentence_transformers import SentenceTransformer
+
+        self._faiss = faiss
+        self.threshold = threshold
+        self.encoder = SentenceTransformer(model_name)
+        self.index_path = os.path.join(cache_dir, "index.faiss")
+        self.entries_path = os.path.join(cache_dir, "entries.json")
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        if os.path.exists(self.index_path) and os.path.exists(self.entries_path):
+            self.index = faiss.read_index(self.index_path)
+            with open(self.entries_path, "rb") as f:
+                self.entries: List[Dict[str, Any]] = orjson.loads(f.read())
+        else:
+            self.index = faiss.IndexFlatIP(self.encoder.get_sentence_embedding_dimension())
+            self.entries = []
+
+    def _embed(self, messages: List[Dict[str, Any]]) -> Any:
+        """
+        Embed the text of the last message as a normalized vector.
+
+        Args:
+            messages (List[Dict[str, Any]]): The messages sent to the model.
+
+        Returns:
+            Any: A (1, dim) float32 array suitable for the FAISS index.
+        """
+        from context import message_text
+
+        return self.encoder.encode(
+            [message_text(messages[-1])],
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+
+    def lookup(self, model: str, messages: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached response to a similar question in the same context.
+
+        Args:
+            model (str): The model the request is sent to.
+            messages (List[Dict[str, Any]]): The messages sent to the model.
+
+        Returns:
+            Optional[Dict[str, Any]]: The cached response if found, else None.
+        """
+        if self.index.ntotal == 0:
+            return None
+        key = context_key(model, messages)
+        scores, ids = self.index.search(self._embed(messages), min(5, self.index.ntotal))
+        for score, idx in zip(scores[0], ids[0]):
+            if score < self.threshold:
+                break
+            # Vectors without an entry, left by an interrupted store, are skipped.
+            if not 0 <= idx < len(self.entries):
+                continue
+            entry = self.entries[idx]
+            if entry["context"] == key:
+                return entry["response"]
+        return None
+
+    def store(self, model: str, messages: List[Dict[str, Any]], response: Dict[str, Any]) -> None:
+        """
+        Add a question and its response to the index and persist both.
+
+        Args:
+            model (str): The model the request was sent to.
+            messages (List[Dict[str, Any]]): The messages sent to the model.
+            response (Dict[str, Any]): The API response to store.
+        """
+        self.index.add(self._embed(messages))
+        self.entries.append({"context": context_key(model, messages), "response": response})
+        # Each file is replaced atomically. The entries go first, so a crash in
+        # between leaves the index without the new vector instead of pointing
+        # past the end of the entries.
+        entries_tmp = f"{self.entries_path}.tmp"
+        with open(entries_tmp, "wb") as f:
+            f.write(orjson.dumps(self.entries))
+        os.replace(entries_tmp, self.entries_path)
+        index_tmp = f"{self.index_path}.tmp"
+        self._faiss.write_index(self.index, index_tmp)
+        os.replace(index_tmp, self.index_path)
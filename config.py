@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Module for loading application settings from the environment.
+"""
+import os
+from dataclasses import dataclass
+from functools import cache
+from typing import Callable, Dict, Optional, Union
+
+from dotenv import load_dotenv
+
+
+def _env_number(
+    env: Dict[str, str],
+    name: str,
+    default: Union[int, float],
+    cast: Callable[[str], Union[int, float]]
+) -> Optional[Union[int, float]]:
+    """
+    Read a numeric setting where zero or a negative value turns the feature off.
+
+    Args:
+        env (Dict[str, str]): Snapshot of the environment.
+        name (str): Name of the environment variable.
+        default (Union[int, float]): Value used when the variable is unset or blank.
+        cast (Callable[[str], Union[int, float]]): Converts the raw string, e.g. int.
+
+    Returns:
+        Optional[Union[int, float]]: The value, or None if it is zero or negative.
+
+    Raises:
+        ValueError: If the variable is set to something that is not a number.
+    """
+    raw = env.get(name, "").strip()
+    try:
+        value = cast(raw) if raw else default
+    except ValueError:
+        raise ValueError(f"{name} must be a number, got {raw!r}") from None
+    return value if value > 0 else None
+
+
+@dataclass
+class Settings:
+    """
+    Settings for the Open-GPT CLI application, read from environment variables.
+    """
+    api_key: str = ""
+    model: str = ""
+    site_url: Optional[str] = None
+    site_title: Optional[str] = None
+    stream: bool = True
+    requests_per_minute: Optional[int] = 300
+    cache_ttl: Optional[float] = 86400
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """
+        Build the settings from a single snapshot of the environment.
+
+        Returns:
+            Settings: The settings; blank optional values are normalized to None.
+
+        Raises:
+            ValueError: If a numeric setting is not a number.
+        """
+        env = dict(os.environ)
+        return cls(
+            api_key=env.get("OPENROUTER_API_KEY", "").strip(),
+            model=env.get("OPENROUTER_MODEL", "").strip(),
+            site_url=env.get("SITE_URL", "").strip() or None,
+            site_title=env.get("SITE_TITLE", "").strip() or None,
+            # Stream tokens as they are generated unless explicitly disabled.
+            stream=env.get("OPENROUTER_STREAM", "true").strip().lower() not in ("0", "false", "no"),
+            # Client-side request budget; 0 disables throttling.
+            requests_per_minute=_env_number(env, "OPENROUTER_RPM", 300, int),
+            # Lifetime of cached responses in seconds; 0 keeps them forever.
+            cache_ttl=_env_number(env, "OPENROUTER_CACHE_TTL", 86400.0, float),
+        )
+
+
+@cache
+def get_config() -> Settings:
+    """
+    Load the .env file and read the settings, once per process.
+
+    Returns:
+        Settings: The shared application settings.
+    """
+    load_dotenv()
+    return Settings.from_env()
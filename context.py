@@ -3,17 +3,69 @@
 Module for managing conversation context.
 """
 from collections import deque
-from typing import Deque, List, Dict, Any
+from typing import Deque, Iterable, List, Dict, Any, Optional
+
+
+# Prefix that marks the system message carrying the running summary.
+SUMMARY_PREFIX: str = "Summary of the earlier conversation: "
+
+# Rough characters-per-token ratio used to estimate message sizes.
+CHARS_PER_TOKEN: int = 4
+
+
+def message_text(message: Dict[str, Any]) -> str:
+    """
+    Extract the plain text of a message.
+
+    Args:
+        message (Dict[str, Any]): A chat message.
+
+    Returns:
+        str: The concatenated text of the message content.
+    """
+    content = message.get("content", "")
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content)
+
+
+def estimate_tokens(message: Dict[str, Any]) -> int:
+    """
+    Estimate the token count of a message with a character heuristic.
+
+    Args:
+        message (Dict[str, Any]): A chat message.
+
+    Returns:
+        int: The approximate number of tokens in the message.
+    """
+    return len(message_text(message)) // CHARS_PER_TOKEN
 
 
 class ConversationContext:
     """
     Class to manage conversation context for the Open-GPT CLI application.
-    Maintains a sliding window of recent interactions.
+    Maintains a sliding window of recent interactions. Messages that fall out
+    of the window are collected so they can be folded into a running summary.
     """
 
-    def __init__(self, max_messages: int = 10) -> None:
+    def __init__(self, max_messages: int = 10, summarize_every: int = 4) -> None:
         self.history: Deque[Dict[str, Any]] = deque(maxlen=max_messages)
+        self.summary: Optional[str] = None
+        self.summarize_every: int = summarize_every
+        self._evicted: List[str] = []
+
+    def _append(self, message: Dict[str, Any]) -> None:
+        """
+        Append a message, keeping the text of the one the window evicts.
+
+        Args:
+            message (Dict[str, Any]): The message to append.
+        """
+        if len(self.history) == self.history.maxlen:
+            oldest = self.history[0]
+            self._evicted.append(f"{oldest['role']}: {message_text(oldest)}")
+        self.history.append(message)
 
     def add_user_message(self, message: str) -> None:
         """
@@ -26,7 +78,7 @@ class ConversationContext:
             "role": "user",
             "content": [{"type": "text", "text": message}]
         }
-        self.history.append(user_message)
+        self._append(user_message)
 
     def add_assistant_message(self, message: str) -> None:
         """
@@ -39,13 +91,109 @@ class ConversationContext:
             "role": "assistant",
             "content": [{"type": "text", "text": message}]
         }
-        self.history.append(assistant_message)
+        self._append(assistant_message)
+
+    def discard_last_user_message(self) -> None:
+        """
+        Remove the newest message if it is a user message, e.g. after its request failed.
+        """
+        if self.history and self.history[-1].get("role") == "user":
+            self.history.pop()
+
+    def take_evicted(self) -> List[str]:
+        """
+        Hand over the evicted messages once enough have accumulated to summarize.
+
+        Returns:
+            List[str]: The evicted messages as "role: text" lines, or an empty
+            list if fewer than summarize_every are pending.
+        """
+        if len(self._evicted) < self.summarize_every:
+            return []
+        evicted, self._evicted = self._evicted, []
+        return evicted
+
+    def set_summary(self, summary: str) -> None:
+        """
+        Replace the running summary of the evicted conversation.
+
+        Args:
+            summary (str): The new summary text.
+        """
+        self.summary = summary
+
+    def load_history(self, messages: Iterable[Dict[str, Any]]) -> None:
+        """
+        Replace the conversation with previously saved messages.
+
+        A leading summary message, as produced by get_context, is restored as
+        the running summary rather than kept as a regular message.
+
+        Args:
+            messages (Iterable[Dict[str, Any]]): The saved messages.
+        """
+        messages = list(messages)
+        self.summary = None
+        self._evicted = []
+        if messages and messages[0].get("role") == "system":
+            text = message_text(messages[0])
+            if text.startswith(SUMMARY_PREFIX):
+                self.summary = text[len(SUMMARY_PREFIX):]
+                messages = messages[1:]
+        self.history = deque(messages, maxlen=self.history.maxlen)
+
+    def _summary_message(self) -> Dict[str, Any]:
+        """
+        Build the system message that carries the running summary.
+
+        Returns:
+            Dict[str, Any]: The summary message.
+        """
+        return {
+            "role": "system",
+            "content": [{"type": "text", "text": SUMMARY_PREFIX + self.summary}]
+        }
 
-    def get_context(self) -> List[Dict[str, Any]]:
+    def get_context(self) -> Iterable[Dict[str, Any]]:
         """
-        Retrieve the current conversation context as a list of messages.
+        Retrieve the current conversation context without copying it.
+
+        The returned view is the live history; callers that need a list
+        (e.g. for JSON serialization) should convert it themselves. When a
+        summary exists, it is prepended as a system message.
+
+        Returns:
+            Iterable[Dict[str, Any]]: The conversation history.
+        """
+        if self.summary:
+            return [self._summary_message(), *self.history]
+        return self.history
+
+    def get_budgeted_context(self, max_tokens: int) -> List[Dict[str, Any]]:
+        """
+        Retrieve the most recent messages that fit within a token budget.
+
+        The newest message is always included, even if it exceeds the budget
+        on its own, so the current question is never dropped. The running
+        summary, if any, is prepended when it still fits.
+
+        Args:
+            max_tokens (int): Approximate token budget for the returned messages.
 
         Returns:
-            List[Dict[str, Any]]: The conversation history.
+            List[Dict[str, Any]]: The trimmed conversation history, oldest first.
         """
-        return list(self.history)
+        budgeted: List[Dict[str, Any]] = []
+        used = 0
+        for message in reversed(self.history):
+            tokens = estimate_tokens(message)
+            if used + tokens > max_tokens and budgeted:
+                break
+            used += tokens
+            budgeted.append(message)
+        budgeted.reverse()
+        if self.summary:
+            summary_message = self._summary_message()
+            if used + estimate_tokens(summary_message) <= max_tokens:
+                budgeted.insert(0, summary_message)
+        return budgeted
@@ -2,20 +2,27 @@
 """
 Main CLI module for the Open-GPT CLI application.
 """
-import os
 import sys
+import argparse
+import asyncio
 import getpass
-import readline  # Import readline for command autocompletion
-from dotenv import load_dotenv, set_key
-from rich.console import Console
-from rich.markdown import Markdown
-from rich.prompt import Confirm
-from api import send_request
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Union
+import orjson
+from dotenv import set_key
+from config import Settings, get_config
+from api import APIError, send_request, aclose_client, set_rate_limit
+from batch import load_questions, send_many
 from exports import export_response
 from context import ConversationContext  # Import context management module
 from session import SessionManager  # Import session manager for session persistence
 from promts import PromptsManager  # Import prompts manager for important prompt persistence
 
+if TYPE_CHECKING:
+    from cache import ResponseCache, SemanticCache
+    from rich.console import Console
+    from rich.syntax import Syntax
+
 # Define the list of available commands for autocompletion.
 COMMANDS = [
     "/export-md",
@@ -26,46 +33,286 @@ COMMANDS = [
     "/save-prompt",
     "/list-prompts",
     "/load-prompt",
+    "/batch",
     "exit",
     "quit",
 ]
 
+# Approximate token budget for the history sent with each request.
+MAX_CONTEXT_TOKENS = 8000
+
+# Rich rendering is reserved for terminals; piped output gets the raw text.
+_INTERACTIVE: bool = sys.stdout.isatty()
+
+# Responses shorter than this without any Markdown syntax are printed as-is.
+PLAIN_TEXT_MAX_LEN = 500
+# Characters that may introduce Markdown formatting. Newlines are included
+# because Markdown reflows soft line breaks, which plain printing would not.
+_MD_SIGILS = frozenset("#*`[|_>\n")
 
-def completer(text: str, state: int) -> str:
+# Instruction used to fold messages that leave the context window into a summary.
+SUMMARY_INSTRUCTION = (
+    "Summarize the following conversation excerpt in a few sentences, keeping "
+    "facts, decisions and open questions the assistant may need later. "
+    "Reply with the summary only."
+)
+
+
+@dataclass(slots=True)
+class LastExchange:
+    """
+    The most recent question/response pair, kept for the export commands.
     """
-    Autocompletion function for readline.
+    question: Optional[str] = None
+    response: Optional[str] = None
+
+
+def _pretty_json(data: Any) -> "Syntax":
+    """
+    Serialize data once with orjson and wrap it for highlighted display.
 
     Args:
-        text (str): The current text entered.
-        state (int): The index of the matching option.
+        data (Any): JSON-serializable data, typically an API response.
 
     Returns:
-        str: The matching command or None if no more matches.
+        Syntax: A renderable with the indented, highlighted JSON.
     """
-    options = [cmd for cmd in COMMANDS if cmd.startswith(text)]
-    if state < len(options):
-        return options[state]
-    else:
+    from rich.syntax import Syntax
+
+    return Syntax(orjson.dumps(data, option=orjson.OPT_INDENT_2).decode(), "json", theme="monokai")
+
+
+def report_error(console: "Console", title: str, result: Dict[str, Any], verbose: bool) -> None:
+    """
+    Print a failed API result with a single console call.
+
+    Args:
+        console (Console): Rich console for output.
+        title (str): Short description of what went wrong.
+        result (Dict[str, Any]): The API response that caused the error.
+        verbose (bool): Show the full response instead of just the error message.
+    """
+    from rich.markup import escape
+
+    if verbose:
+        from rich.panel import Panel
+
+        console.print(Panel(_pretty_json(result), title=f"[bold red]❌ {escape(title)}[/bold red]", border_style="red"))
+        return
+    error = result.get("error")
+    message = error.get("message", error) if isinstance(error, dict) else error
+    console.print(f"[bold red]❌ {escape(title)}:[/bold red] {escape(str(message or result))}")
+
+
+def render_response(console: "Console", content: str) -> None:
+    """
+    Print an assistant response, skipping the Markdown parser for short plain text.
+
+    When stdout is not a terminal the raw text is written unchanged, since
+    ANSI styling is of no use in files and pipes.
+
+    Args:
+        console (Console): Rich console for output.
+        content (str): The response text.
+    """
+    if not _INTERACTIVE:
+        sys.stdout.write(content)
+        sys.stdout.write("\n")
+        return
+    if len(content) < PLAIN_TEXT_MAX_LEN and not any(c in _MD_SIGILS for c in content):
+        console.print(content, markup=False, emoji=False, highlight=False)
+        return
+    from rich.markdown import Markdown
+
+    console.print(Markdown(content))
+
+
+def print_numbered(console: "Console", title: str, names: List[str]) -> None:
+    """
+    Print a numbered list of saved files under a heading.
+
+    Args:
+        console (Console): Rich console for output.
+        title (str): Heading shown above the list.
+        names (List[str]): The filenames to list.
+    """
+    console.print(f"[bold blue]{title}:[/bold blue]")
+    for idx, name in enumerate(names, 1):
+        console.print(f"{idx}. {name}")
+
+
+async def choose_saved(
+    console: "Console",
+    names: List[str],
+    kind: str,
+    ask: Callable[[], Awaitable[str]]
+) -> Optional[str]:
+    """
+    List saved files and ask the user to pick one by number.
+
+    Args:
+        console (Console): Rich console for output.
+        names (List[str]): The saved filenames to choose from.
+        kind (str): What the files hold, e.g. "session" or "prompt".
+        ask (Callable[[], Awaitable[str]]): Reads one line of user input.
+
+    Returns:
+        Optional[str]: The chosen filename, or None if nothing valid was picked.
+    """
+    if not names:
+        console.print(f"[bold yellow]No saved {kind}s to load.[/bold yellow]")
+        return None
+    print_numbered(console, f"Available {kind.capitalize()}s", names)
+    console.print(f"Enter the {kind} number to load:", end=" ")
+    selection = await ask()
+    try:
+        selection_index = int(selection) - 1
+    except ValueError:
+        console.print("[bold yellow]⚠️ Please enter a valid number.[/bold yellow]")
         return None
+    if 0 <= selection_index < len(names):
+        return names[selection_index]
+    console.print(f"[bold yellow]⚠️ Invalid {kind} number.[/bold yellow]")
+    return None
+
+
 
+async def summarize_evicted(
+    context_manager: ConversationContext,
+    evicted: List[str],
+    api_key: str,
+    model: str,
+    site_url: Optional[str],
+    site_title: Optional[str]
+) -> None:
+    """
+    Fold messages that left the context window into the running summary.
+
+    Summaries are best effort: if the request fails, the previous summary is kept.
+
+    Args:
+        context_manager (ConversationContext): The conversation context to update.
+        evicted (List[str]): The evicted messages as "role: text" lines.
+        api_key (str): The API key for authentication.
+        model (str): The model to be used.
+        site_url (Optional[str]): URL of the site.
+        site_title (Optional[str]): Title of the site.
+    """
+    parts = [SUMMARY_INSTRUCTION]
+    if context_manager.summary:
+        parts.append(f"Current summary:\n{context_manager.summary}")
+    parts.append("New messages:\n" + "\n".join(evicted))
+    try:
+        result = await send_request("\n\n".join(parts), api_key, model, site_url, site_title, show_progress=False)
+        context_manager.set_summary(result["choices"][0]["message"]["content"].strip())
+    except (APIError, KeyError, IndexError, TypeError, AttributeError):
+        pass
+
+
+async def run_batch(
+    console: "Console",
+    path: str,
+    api_key: str,
+    model: str,
+    site_url: Optional[str],
+    site_title: Optional[str],
+    verbose: bool = False,
+    cache: Optional[Union["ResponseCache", "SemanticCache"]] = None
+) -> bool:
+    """
+    Answer every question in a file concurrently and print the results in order.
 
-# Configure readline to use the completer function.
-readline.set_completer(completer)
-readline.parse_and_bind("tab: complete")
+    Args:
+        console (Console): Rich console for output.
+        path (str): Path to a file with one question per line.
+        api_key (str): The API key for authentication.
+        model (str): The model to be used.
+        site_url (Optional[str]): URL of the site.
+        site_title (Optional[str]): Title of the site.
+        verbose (bool): Show full API responses for failed questions.
+        cache (Optional[Union[ResponseCache, SemanticCache]]): Cache to answer
+            repeated questions from.
+
+    Returns:
+        bool: False if the batch file could not be read, else True.
+    """
+    from rich.markup import escape
+
+    try:
+        questions = load_questions(path)
+    except OSError as e:
+        console.print(f"[bold red]❌ Could not read batch file:[/bold red] {escape(str(e))}")
+        return False
+    if not questions:
+        console.print(f"[bold yellow]⚠️ No questions found in {escape(path)}.[/bold yellow]")
+        return True
+
+    with console.status(f"[bold green]🧠 Answering {len(questions)} questions...[/bold green]", spinner="point"):
+        results = await send_many(questions, api_key, model, site_url, site_title, cache=cache)
+
+    for question, result in zip(questions, results):
+        console.rule(f"[bold cyan]{escape(question)}[/bold cyan]")
+        if "error" in result:
+            report_error(console, "Error", result, verbose)
+            continue
+        try:
+            content = result["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError) as e:
+            # One malformed answer should not end the whole run.
+            report_error(console, f"Error extracting content: {e}", result, verbose)
+            continue
+        render_response(console, content)
+    return True
 
 
-def main() -> None:
+async def main() -> None:
     """
     Main function that runs the Open-GPT CLI application.
     """
-    # Load environment variables.
-    load_dotenv()
+    # Rich is imported lazily to keep interpreter start-up light.
+    from rich.console import Console
+    from rich.markup import escape
+
+    parser = argparse.ArgumentParser(description="Open-GPT CLI")
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="send each non-empty line of FILE as an independent question, print the answers and exit",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="show the full API response when a request fails",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="answer repeated requests from an on-disk cache instead of calling the API",
+    )
+    parser.add_argument(
+        "--semantic-cache",
+        action="store_true",
+        help="like --cache, but also match paraphrased questions (needs sentence-transformers and faiss)",
+    )
+    args = parser.parse_args()
+
     env_path: str = ".env"
-    console: Console = Console()
+    console: Console = Console(force_terminal=_INTERACTIVE)
+
+    # Load environment variables.
+    try:
+        settings: Settings = get_config()
+    except ValueError as e:
+        console.print(f"[bold red]❌ Error: {escape(str(e))}[/bold red]")
+        sys.exit(1)
 
     # Initialize the conversation context with a maximum of 10 messages.
     context_manager: ConversationContext = ConversationContext(max_messages=10)
 
+    # Track the last question and response for the export commands.
+    last_exchange: LastExchange = LastExchange()
+
     # Initialize session manager for session persistence.
     session_manager: SessionManager = SessionManager()
 
@@ -73,7 +320,7 @@ def main() -> None:
     prompts_manager: PromptsManager = PromptsManager()
 
     # Check if API key is present; if not, securely prompt the user.
-    api_key: str = os.getenv("OPENROUTER_API_KEY", "").strip()
+    api_key: str = settings.api_key
     if not api_key:
         console.print("[bold yellow]🔑 No API key found! Let's add one now.[/bold yellow]")
         # Use getpass to prevent the API key from being displayed on the screen.
@@ -85,24 +332,62 @@ def main() -> None:
         set_key(env_path, "OPENROUTER_API_KEY", api_key)
 
     # Ensure that the model is defined.
-    model: str = os.getenv("OPENROUTER_MODEL", "").strip()
+    model: str = settings.model
     if not model:
         console.print("[bold red]❌ Error: The variable OPENROUTER_MODEL is not defined in the .env file[/bold red]")
         sys.exit(1)
 
     # Retrieve optional site parameters.
-    site_url: str = os.getenv("SITE_URL", "").strip() or None
-    site_title: str = os.getenv("SITE_TITLE", "").strip() or None
+    site_url: Optional[str] = settings.site_url
+    site_title: Optional[str] = settings.site_title
+    stream: bool = settings.stream
+    set_rate_limit(settings.requests_per_minute)
+    # Opt-in, since cached answers defeat sampling for non-deterministic use.
+    response_cache: Optional[Union["ResponseCache", "SemanticCache"]] = None
+    if args.semantic_cache:
+        # The cache backends (diskcache, faiss) are only loaded when asked for.
+        from cache import SemanticCache
+
+        try:
+            response_cache = SemanticCache()
+        except ImportError as e:
+            console.print(f"[bold red]❌ The semantic cache needs sentence-transformers and faiss:[/bold red] {e}")
+            sys.exit(1)
+    elif args.cache:
+        from cache import ResponseCache
+
+        response_cache = ResponseCache(ttl=settings.cache_ttl)
+
+    # Batch mode: answer every question from the file, then exit.
+    if args.batch:
+        if not await run_batch(console, args.batch, api_key, model, site_url, site_title, args.verbose, response_cache):
+            sys.exit(1)
+        return
+
+    # Background task folding evicted messages into the context summary.
+    summary_task: Optional[asyncio.Task] = None
+
+    # Input is read asynchronously, so background tasks such as summaries
+    # make progress while the user is typing.
+    # prompt_toolkit is only needed once the interactive loop starts.
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.completion import WordCompleter
+
+    # Tab completion for the commands, matched against the whole input line.
+    prompt_session: PromptSession = PromptSession(completer=WordCompleter(COMMANDS, sentence=True))
+
+    async def ask() -> str:
+        return (await prompt_session.prompt_async(">> ")).strip()
 
     # Welcome message and instructions.
     console.print("[bold green]✨ Welcome to Open-GPT CLI! ✨[/bold green]")
     console.print(
-        "Type your question or type 'exit' to quit. Commands: /export-md, /export-html, /save-session, /list-sessions, /load-session, /save-prompt, /list-prompts, /load-prompt\n")
+        "Type your question or type 'exit' to quit. Commands: /export-md, /export-html, /save-session, /list-sessions, /load-session, /save-prompt, /list-prompts, /load-prompt, /batch <file>\n")
 
     while True:
         # Prompt the user for input.
         console.print("[bold cyan]🔍 What's on your mind? (or 'exit' to quit):[/bold cyan]", end=" ")
-        question: str = input(">> ").strip()
+        question: str = await ask()
 
         # Validate that the input is not empty.
         if not question:
@@ -117,7 +402,7 @@ def main() -> None:
         # Handle session persistence commands.
         if question.startswith("/save-session"):
             # Save the current conversation session.
-            filename = session_manager.save_session(context_manager.get_context())
+            filename = session_manager.save_session(list(context_manager.get_context()))
             console.print(f"[bold green]💾 Session saved: {filename}[/bold green]")
             continue
 
@@ -125,46 +410,29 @@ def main() -> None:
             # List all saved sessions.
             sessions = session_manager.list_sessions()
             if sessions:
-                console.print("[bold blue]Saved Sessions:[/bold blue]")
-                for idx, sess in enumerate(sessions, 1):
-                    console.print(f"{idx}. {sess}")
+                print_numbered(console, "Saved Sessions", sessions)
             else:
                 console.print("[bold yellow]No saved sessions found.[/bold yellow]")
             continue
 
         if question.startswith("/load-session"):
             # List sessions and prompt the user to select one to load.
-            sessions = session_manager.list_sessions()
-            if sessions:
-                console.print("[bold blue]Available Sessions:[/bold blue]")
-                for idx, sess in enumerate(sessions, 1):
-                    console.print(f"{idx}. {sess}")
-                console.print("Enter the session number to load:", end=" ")
-                selection = input(">> ").strip()
-                try:
-                    selection_index = int(selection) - 1
-                    if 0 <= selection_index < len(sessions):
-                        loaded = session_manager.load_session(sessions[selection_index])
-                        if loaded is not None:
-                            # Replace the current conversation context with the loaded session.
-                            from collections import deque
-                            context_manager.history = deque(loaded, maxlen=10)
-                            console.print(f"[bold green]🔄 Session '{sessions[selection_index]}' loaded successfully.[/bold green]")
-                        else:
-                            console.print("[bold red]❌ Failed to load session.[/bold red]")
-                    else:
-                        console.print("[bold yellow]⚠️ Invalid session number.[/bold yellow]")
-                except ValueError:
-                    console.print("[bold yellow]⚠️ Please enter a valid number.[/bold yellow]")
-            else:
-                console.print("[bold yellow]No saved sessions to load.[/bold yellow]")
+            chosen = await choose_saved(console, session_manager.list_sessions(), "session", ask)
+            if chosen is not None:
+                loaded = session_manager.load_session(chosen)
+                if loaded is not None:
+                    # Replace the current conversation context with the loaded session.
+                    context_manager.load_history(loaded)
+                    console.print(f"[bold green]🔄 Session '{chosen}' loaded successfully.[/bold green]")
+                else:
+                    console.print("[bold red]❌ Failed to load session.[/bold red]")
             continue
 
         # Handle important prompt persistence commands.
         if question.startswith("/save-prompt"):
             # Prompt the user to enter the prompt text to save.
             console.print("[bold cyan]Enter the prompt text to save:[/bold cyan]", end=" ")
-            prompt_text = input(">> ").strip()
+            prompt_text = await ask()
             if prompt_text:
                 filename = prompts_manager.save_prompt(prompt_text)
                 console.print(f"[bold green]💾 Prompt saved: {filename}[/bold green]")
@@ -176,90 +444,98 @@ def main() -> None:
             # List all saved important prompts.
             prompts = prompts_manager.list_prompts()
             if prompts:
-                console.print("[bold blue]Saved Prompts:[/bold blue]")
-                for idx, prom in enumerate(prompts, 1):
-                    console.print(f"{idx}. {prom}")
+                print_numbered(console, "Saved Prompts", prompts)
             else:
                 console.print("[bold yellow]No saved prompts found.[/bold yellow]")
             continue
 
         if question.startswith("/load-prompt"):
             # List prompts and prompt the user to select one to load.
-            prompts = prompts_manager.list_prompts()
-            if prompts:
-                console.print("[bold blue]Available Prompts:[/bold blue]")
-                for idx, prom in enumerate(prompts, 1):
-                    console.print(f"{idx}. {prom}")
-                console.print("Enter the prompt number to load:", end=" ")
-                selection = input(">> ").strip()
-                try:
-                    selection_index = int(selection) - 1
-                    if 0 <= selection_index < len(prompts):
-                        loaded_prompt = prompts_manager.load_prompt(prompts[selection_index])
-                        if loaded_prompt:
-                            # Insert the loaded prompt into the conversation context as a user message.
-                            context_manager.add_user_message(loaded_prompt)
-                            console.print(f"[bold green]🔄 Prompt '{prompts[selection_index]}' loaded into the conversation context.[/bold green]")
-                        else:
-                            console.print("[bold red]❌ Failed to load prompt.[/bold red]")
-                    else:
-                        console.print("[bold yellow]⚠️ Invalid prompt number.[/bold yellow]")
-                except ValueError:
-                    console.print("[bold yellow]⚠️ Please enter a valid number.[/bold yellow]")
-            else:
-                console.print("[bold yellow]No saved prompts to load.[/bold yellow]")
+            chosen = await choose_saved(console, prompts_manager.list_prompts(), "prompt", ask)
+            if chosen is not None:
+                loaded_prompt = prompts_manager.load_prompt(chosen)
+                if loaded_prompt:
+                    # Insert the loaded prompt into the conversation context as a user message.
+                    context_manager.add_user_message(loaded_prompt)
+                    console.print(f"[bold green]🔄 Prompt '{chosen}' loaded into the conversation context.[/bold green]")
+                else:
+                    console.print("[bold red]❌ Failed to load prompt.[/bold red]")
+            continue
+
+        # Answer every question in a file concurrently, outside the conversation.
+        if question.startswith("/batch"):
+            parts = question.split(maxsplit=1)
+            if len(parts) < 2:
+                console.print("[bold yellow]⚠️ Usage: /batch <file>[/bold yellow]")
+                continue
+            await run_batch(console, parts[1], api_key, model, site_url, site_title, args.verbose, response_cache)
             continue
 
         # Handle export commands.
         if question.startswith("/export-"):
-            if not hasattr(main, "last_question") or not hasattr(main, "last_response"):
+            if last_exchange.question is None or last_exchange.response is None:
                 console.print("[bold yellow]⚠️ No previous conversation to export![/bold yellow]")
                 continue
 
             if question == "/export-md":
-                filename = export_response(main.last_question, main.last_response, "markdown")
+                filename = export_response(last_exchange.question, last_exchange.response, "markdown")
                 console.print(f"[bold green]📝 Exported to Markdown: {filename}[/bold green]")
             elif question == "/export-html":
-                filename = export_response(main.last_question, main.last_response, "html")
+                filename = export_response(last_exchange.question, last_exchange.response, "html")
                 console.print(f"[bold green]🌐 Exported to HTML: {filename}[/bold green]")
             continue
 
         # Add the current user message to the conversation context.
         context_manager.add_user_message(question)
-        # Retrieve the current conversation history including the new message.
-        payload_history = context_manager.get_context()
+        # Retrieve the recent conversation history that fits the token budget.
+        payload_history = context_manager.get_budgeted_context(max_tokens=MAX_CONTEXT_TOKENS)
 
         # Send the API request with the conversation context.
-        result = send_request(
-            question,
-            api_key,
-            model,
-            site_url,
-            site_title,
-            console=console,
-            history=payload_history  # Passing the conversation context
-        )
+        try:
+            result = await send_request(
+                question,
+                api_key,
+                model,
+                site_url,
+                site_title,
+                console=console,
+                history=payload_history,  # Passing the conversation context
+                stream=stream,
+                cache=response_cache
+            )
+        except APIError as err:
+            console.print(f"[bold red]❌ Request failed:[/bold red] {escape(str(err))}")
+            # Keep unanswered questions out of the history sent with later turns.
+            context_manager.discard_last_user_message()
+            continue
 
         # Process the API response.
         if "error" in result:
-            console.print("[bold red]❌ Error:[/bold red]", result["error"])
-            console.print("Full response:")
-            console.print_json(data=result)
+            report_error(console, "Error", result, args.verbose)
+            context_manager.discard_last_user_message()
         else:
             try:
                 # Extract the assistant's reply from the API result.
                 content: str = result["choices"][0]["message"]["content"]
                 # Add the assistant's response to the conversation context.
                 context_manager.add_assistant_message(content)
+                # Summarize messages that left the window in the background; the
+                # summary is picked up by a later request.
+                if summary_task is None or summary_task.done():
+                    evicted = context_manager.take_evicted()
+                    if evicted:
+                        summary_task = asyncio.create_task(summarize_evicted(
+                            context_manager, evicted, api_key, model, site_url, site_title
+                        ))
                 # Store the last question and response for potential export.
-                main.last_question = question
-                main.last_response = content
-                # Display the assistant's response using markdown formatting.
-                md: Markdown = Markdown(content)
-                console.print(md)
+                last_exchange.question = question
+                last_exchange.response = content
+                # Display the assistant's response, using markdown formatting if needed.
+                render_response(console, content)
 
                 '''  
                 # Ask if the user wants to export the response.
+                from rich.prompt import Confirm
                 if Confirm.ask("[bold cyan]📥 Export this response?[/bold cyan]", default=False):
                     console.print("[bold]Select export format:[/bold]")
                     console.print("1. Markdown (.md)")
@@ -277,12 +553,29 @@ def main() -> None:
 
             except Exception as e:
                 # Handle any exceptions during response processing.
-                console.print(f"[bold red]⚠️ Error extracting content:[/bold red] {e}")
-                console.print("Full response:")
-                console.print_json(data=result)
+                report_error(console, f"Error extracting content: {e}", result, args.verbose)
+                context_manager.discard_last_user_message()
         # Print a separator after each interaction.
         console.print("\n[dim]✧✧✧✧✧✧✧✧✧✧✧✧✧✧✧✧✧✧✧✧✧✧✧✧✧[/dim]\n")
 
 
+async def _run() -> None:
+    """
+    Run the CLI and release the shared HTTP client when it ends.
+    """
+    try:
+        await main()
+    finally:
+        await aclose_client()
+
+
 if __name__ == '__main__':
-    main()
+    try:
+        # uvloop is an optional, faster event loop; it does not support Windows.
+        if sys.platform == "win32":
+            raise ImportError
+        import uvloop
+    except ImportError:
+        asyncio.run(_run())
+    else:
+        uvloop.run(_run())
@@ -5,9 +5,10 @@ Prompts are stored as JSON files in a designated directory.
 """
 
 import os
-import json
+import orjson
+from pathlib import Path
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Set
 
 class PromptsManager:
     """
@@ -24,6 +25,9 @@ class PromptsManager:
         self.prompts_dir = prompts_dir
         if not os.path.exists(self.prompts_dir):
             os.makedirs(self.prompts_dir)
+        # Filenames seen in the directory, and its mtime when they were listed.
+        self._index: Optional[Set[str]] = None
+        self._index_mtime: int = 0
 
     def save_prompt(self, prompt_text: str, prompt_name: Optional[str] = None) -> str:
         """
@@ -39,8 +43,19 @@ class PromptsManager:
         if prompt_name is None:
             prompt_name = datetime.now().strftime("prompt_%Y%m%d_%H%M%S")
         filename = os.path.join(self.prompts_dir, f"{prompt_name}.json")
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump({"prompt": prompt_text}, f, indent=4)
+        # Write to a temporary file and rename it over the target, so a crash
+        # mid-write never leaves a truncated file behind.
+        tmp = Path(f"{filename}.tmp")
+        before = os.stat(self.prompts_dir).st_mtime_ns
+        tmp.write_bytes(orjson.dumps({"prompt": prompt_text}, option=orjson.OPT_INDENT_2))
+        os.replace(tmp, filename)
+        if self._index is not None and before == self._index_mtime:
+            # Record our own write so the next listing does not rescan for it.
+            self._index.add(os.path.basename(filename))
+            self._index_mtime = os.stat(self.prompts_dir).st_mtime_ns
+        else:
+            # The directory changed since it was listed; rescan next time.
+            self._index = None
         return filename
 
     def list_prompts(self) -> List[str]:
@@ -48,10 +63,16 @@ class PromptsManager:
         List all saved prompt files.
 
         Returns:
-            List[str]: A list of prompt filenames.
+            List[str]: A sorted list of prompt filenames.
         """
-        files = [f for f in os.listdir(self.prompts_dir) if f.endswith(".json")]
-        return files
+        # Rescan only when the directory changed since the last listing.
+        mtime = os.stat(self.prompts_dir).st_mtime_ns
+        if self._index is None or mtime != self._index_mtime:
+            # scandir yields the names straight from the directory stream.
+            with os.scandir(self.prompts_dir) as entries:
+                self._index = {e.name for e in entries if e.name.endswith(".json") and e.is_file()}
+            self._index_mtime = mtime
+        return sorted(self._index)
 
     def load_prompt(self, prompt_file: str) -> Optional[str]:
         """
@@ -65,7 +86,6 @@ class PromptsManager:
         """
         path = os.path.join(self.prompts_dir, prompt_file)
         if os.path.exists(path):
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = orjson.loads(Path(path).read_bytes())
             return data.get("prompt")
         return None
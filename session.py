@@ -5,9 +5,10 @@ Sessions are stored as JSON files in a designated directory.
 """
 
 import os
-import json
+import orjson
+from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set
 
 class SessionManager:
     """
@@ -24,6 +25,9 @@ class SessionManager:
         self.sessions_dir = sessions_dir
         if not os.path.exists(self.sessions_dir):
             os.makedirs(self.sessions_dir)
+        # Filenames seen in the directory, and its mtime when they were listed.
+        self._index: Optional[Set[str]] = None
+        self._index_mtime: int = 0
 
     def save_session(self, session_data: List[Dict[str, Any]], session_name: Optional[str] = None) -> str:
         """
@@ -39,8 +43,19 @@ class SessionManager:
         if session_name is None:
             session_name = datetime.now().strftime("session_%Y%m%d_%H%M%S")
         filename = os.path.join(self.sessions_dir, f"{session_name}.json")
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(session_data, f, indent=4)
+        # Write to a temporary file and rename it over the target, so a crash
+        # mid-write never leaves a truncated file behind.
+        tmp = Path(f"{filename}.tmp")
+        before = os.stat(self.sessions_dir).st_mtime_ns
+        tmp.write_bytes(orjson.dumps(session_data, option=orjson.OPT_INDENT_2))
+        os.replace(tmp, filename)
+        if self._index is not None and before == self._index_mtime:
+            # Record our own write so the next listing does not rescan for it.
+            self._index.add(os.path.basename(filename))
+            self._index_mtime = os.stat(self.sessions_dir).st_mtime_ns
+        else:
+            # The directory changed since it was listed; rescan next time.
+            self._index = None
         return filename
 
     def list_sessions(self) -> List[str]:
@@ -48,10 +63,16 @@ class SessionManager:
         List all saved session files.
 
         Returns:
-            List[str]: A list of session filenames.
+            List[str]: A sorted list of session filenames.
         """
-        files = [f for f in os.listdir(self.sessions_dir) if f.endswith(".json")]
-        return files
+        # Rescan only when the directory changed since the last listing.
+        mtime = os.stat(self.sessions_dir).st_mtime_ns
+        if self._index is None or mtime != self._index_mtime:
+            # scandir yields the names straight from the directory stream.
+            with os.scandir(self.sessions_dir) as entries:
+                self._index = {e.name for e in entries if e.name.endswith(".json") and e.is_file()}
+            self._index_mtime = mtime
+        return sorted(self._index)
 
     def load_session(self, session_file: str) -> Optional[List[Dict[str, Any]]]:
         """
@@ -65,7 +86,6 @@ class SessionManager:
         """
         path = os.path.join(self.sessions_dir, session_file)
         if os.path.exists(path):
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = orjson.loads(Path(path).read_bytes())
             return data
         return None